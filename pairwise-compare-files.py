@@ -3,20 +3,34 @@
 #  file. List is unordered.
 
 # adaptable for creating a shell script for automation:
-#  print(f"python TMscore.exe {file1} {file2}")
+#  lines.append(f"python TMscore.exe {file1} {file2}\n")
+
+# or the list of pairs can be run in parallel as it is printed,
+#  from within the directory of the files, with GNU parallel:
+#  python pairwise-compare-files.py | parallel -j 8 --colsep ' ' TMscore {1} {2}
 
 # modify directory name below
 
 import os
+import sys
 from itertools import combinations
 
 def pairwise_comparisons(directory):
-    files = os.listdir(directory)
+    # list the names of the files, skipping any subdirectories
+    with os.scandir(directory) as entries:
+        files = [entry.name for entry in entries if entry.is_file()]
+    # collect the lines in a list and write them to stdout in
+    #  blocks of 10000 lines, instead of one print() per pair
+    lines = []
     for file1, file2 in combinations(files, 2):
         # print list of all pairs of files
         # "f" refers to "formatted string literal"
         #  introduced in python version 3.6
-        print(f"{file1} {file2}")
+        lines.append(f"{file1} {file2}\n")
+        if len(lines) == 10000:
+            sys.stdout.write(''.join(lines))
+            lines.clear()
+    sys.stdout.write(''.join(lines))
 
 # modify directory to the files of interest
 directory = 'C:/Peptide3d/data'
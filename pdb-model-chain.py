@@ -2,22 +2,47 @@
 #  for a directory of PDB formatted files with
 #  extension name "pdb" (.pdb)
 
-import glob
-from Bio.PDB.PDBParser import PDBParser
+# the model and chain are read directly from the fixed-width
+#  columns of the ATOM/HETATM records with numpy, instead of
+#  building a full Biopython structure for each file
 
-# assign functions
-parser = PDBParser()
+import glob
+import numpy as np
 
 # input file
 for file in glob.glob('./*.pdb'):
     print("file: ", file)
 
-    # retrieve PDB structure
-    structure = parser.get_structure(file, file)
+    # retrieve PDB records as 80 column byte strings
+    with open(file, 'rb') as f:
+        records = np.array(f.read().splitlines(), dtype='S80')
+    columns = records.view('S1').reshape(len(records), 80)
+
+    # record name (columns 1-6) and chain identifier (column 22)
+    record = columns[:, :6].copy().view('S6').ravel()
+    chain = columns[:, 21]
+
+    # models are numbered from 0 in order of the MODEL records,
+    #  as in Biopython; a file without MODEL records is model 0
+    #  (compared on columns 1-5, since a bare MODEL line is
+    #  padded with null bytes rather than spaces)
+    is_model = columns[:, :5].copy().view('S5').ravel() == b'MODEL'
+    model = np.maximum(np.cumsum(is_model) - 1, 0)
+
+    # keep the coordinate records only
+    atoms = np.isin(record, [b'ATOM  ', b'HETATM'])
+    model = model[atoms]
+    chain = chain[atoms]
+
+    # first occurrence of each model and chain pair, in file order
+    key = model.astype(np.int64) * 256 + chain.view(np.uint8)
+    first = np.sort(np.unique(key, return_index=True)[1])
 
-    # iterate over models and chains in file
-    for model in structure:
-        print("model: ", model)
-        for chain in model:
-           print("chain: ", chain)
+    # print models and chains in file
+    current_model = None
+    for model_id, chain_id in zip(model[first], chain[first]):
+        if model_id != current_model:
+            current_model = model_id
+            print("model: ", f"<Model id={model_id}>")
+        print("chain: ", f"<Chain id={chain_id.decode()}>")
 
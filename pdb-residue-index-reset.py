@@ -1,38 +1,86 @@
 # python3 code to reset residue number value to 1
 #  for the PDB formatted files created by pdb-split-files.py
 
+# the residue numbers (columns 23-26) of the ATOM and TER records
+#  are rewritten for the whole file at once with numpy
+
+import mmap
+import multiprocessing
 import os
+import numpy as np
 
 directory = 'C:/Peptide3d/data'
-files = os.listdir(directory)
-
-for file in files:
-    if file.endswith('pdb'):
-        print(file)
-        pdb_file = file
-
-        with open(pdb_file, 'r') as f:
-            lines = f.readlines()
-
-        current_residue = None
-        start_residue = 1
-        current_residue_number = start_residue - 1
-    
-        for i, line in enumerate(lines):
-            if line.startswith('ATOM'):
-                residue = line[22:26]
-                if residue != current_residue:
-                    current_residue = residue
-                    current_residue_number += 1
-                lines[i] = line[:22] + str(current_residue_number).rjust(4) \
-                 + line[26:]
-                
-            if line.startswith('TER'):
-                residue = line[22:26]
-                if residue != current_residue:
-                    current_residue = residue
-                lines[i] = line[:22] + \
-                 str(current_residue_number).rjust(4) + line[26:]
-
-        with open(pdb_file, 'w') as f:
-            f.writelines(lines)
+
+# column offsets of the record name and residue number
+record_columns = np.arange(4)
+residue_columns = np.arange(22, 26)
+
+# reset the residue numbers of a single PDB file
+def renumber(pdb_file):
+    print(os.path.basename(pdb_file))
+
+    # an empty file cannot be memory-mapped
+    if os.path.getsize(pdb_file) == 0:
+        return
+
+    # map the file into memory and copy it to a byte array
+    with open(pdb_file, 'rb') as f, \
+     mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        data = np.frombuffer(mm, dtype=np.uint8).copy()
+
+    # offsets of the start and end of each line
+    ends = np.flatnonzero(data == ord('\n'))
+    starts = np.r_[0, ends + 1]
+    ends = np.r_[ends, len(data)]
+
+    # keep the ATOM records, which must be long enough to hold a
+    #  residue number, and the TER records of any length
+    length = ends - starts
+    starts = starts[length >= 3]
+    length = length[length >= 3]
+    record = data[np.minimum(starts[:, None] + record_columns, len(data) - 1)]
+    is_atom = (record == np.frombuffer(b'ATOM', np.uint8)).all(axis=1) \
+     & (length >= 26)
+    is_ter = (record[:, :3] == np.frombuffer(b'TER', np.uint8)).all(axis=1)
+    keep = is_atom | is_ter
+    starts = starts[keep]
+    is_atom = is_atom[keep]
+    has_residue = length[keep] >= 26
+    if len(starts) == 0:
+        return
+
+    # count a new residue at each ATOM record where the residue
+    #  number differs from that of the previous ATOM or TER record,
+    #  or that follows a TER record too short to hold a number
+    columns = np.minimum(starts[:, None] + residue_columns, len(data) - 1)
+    residue = data[columns]
+    changed = np.r_[True, (residue[1:] != residue[:-1]).any(axis=1)
+     | ~has_residue[:-1]]
+    start_residue = 1
+    residue_number = np.cumsum(changed & is_atom) + start_residue - 1
+
+    # residue numbers past 9999 do not fit in 4 columns, so the
+    #  file is left unchanged
+    if residue_number[-1] > 9999:
+        print(os.path.basename(pdb_file), \
+         "not changed: more than 9999 residues")
+        return
+
+    # write the new residue numbers right justified in 4 columns,
+    #  except in TER records too short to hold them
+    number_text = np.char.rjust(residue_number.astype('S4'), 4) \
+     .view(np.uint8).reshape(-1, 4)
+    data[columns[has_residue]] = number_text[has_residue]
+
+    # write the file once, then replace the original
+    with open(pdb_file + '.tmp', 'wb') as f:
+        f.write(data)
+    os.replace(pdb_file + '.tmp', pdb_file)
+
+# process the files in parallel, one per worker process
+if __name__ == '__main__':
+    with os.scandir(directory) as entries:
+        pdb_files = [entry.path for entry in entries
+         if entry.is_file() and entry.name.endswith('pdb')]
+    with multiprocessing.Pool(os.cpu_count()) as pool:
+        pool.map(renumber, pdb_files, chunksize=4)
@@ -4,53 +4,117 @@
 
 # python pdb-split.py > stdout-batch-1.txt
 
+# the ATOM records of each window of 9 residues are copied
+#  directly from the input file, so the file is read once
+#  and no structure is built or written by Biopython. As with
+#  the Biopython ChainSelector, only the first model is split
+#  and hetero residues (HETATM) and hydrogen atoms are left out
+
 # import modules
+import mmap
+import multiprocessing
 import os
-from Bio.PDB.PDBParser import PDBParser
-from Bio.PDB import PDBIO
-from Bio.PDB.Dice import ChainSelector
-
-# define an alias for modules
-parser = PDBParser()
-io = PDBIO()
+import re
 
 # edit directory for location of PDB formatted files
 directory = 'C:/Peptide3d/data'
-files = os.listdir(directory)
-
-# iterate over files in directory named above
-for file in files:
-    if file.endswith('pdb'):
-        print(file)
-
-        # set variables
-        count = start = length = 0
-
-        # input file
-        file_prefix = os.path.splitext(file)[0]
-        file = os.path.join(directory, file_prefix + '.pdb')
-
-        # retrieve PDB structure
-        structure = parser.get_structure(file, file)
-        io.set_structure(structure)
-
-        # iterate over models and chains in file
-        for model in structure:
-            print("model", model)
-            for chain in model:
-               print("chain", chain)
-               chain_id = chain.get_id()
-               length = len([_ for _ in chain.get_residues()])
-               # iterate over all residues in the protein chain
-               for residue in chain.get_residues():
-                   start += 1
-                   # detect when less than 9 residues are left in chain
-                   if (start + 8 > length):
-                       # exit loop since at end of the chain
-                       break
-                   for count in range(start, start + 8):
-                       # write each subsequence to an unique file
-                       selection = ChainSelector(chain_id, start, start + 8)
-                       file_save = os.path.join(directory, file_prefix + '_' \
-                         + str(start) + '.pdb')
-                       io.save(file_save, selection)
+
+# names of hydrogen atoms, as matched by Bio.PDB.Dice
+hydrogen = re.compile(rb'[123 ]*H')
+
+# split a single PDB file into files of 9 residues
+def split_file(file):
+    print(os.path.basename(file))
+
+    # output files are named after the input file
+    file_prefix = os.path.splitext(file)[0]
+
+    # an empty file cannot be memory-mapped
+    if os.path.getsize(file) == 0:
+        return
+
+    # map the file into memory and read each line as bytes
+    with open(file, 'rb') as f, \
+     mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+
+        # record the byte offsets of the start and end of the
+        #  lines of each residue in the first model, listed by
+        #  protein chain. An ANISOU record is kept with its atom
+        chains = {}
+        chain = residue = number = None
+        keep = False
+        start = 0
+        for line in iter(mm.readline, b''):
+            end = start + len(line)
+            if line.startswith(b'ENDMDL'):
+                break
+            # a chain is split into segments of consecutive residues,
+            #  so that a window never spans a gap in the chain. A gap
+            #  is marked by clearing the previous residue number
+            if line.startswith((b'ATOM', b'HETATM')):
+                if line[21:22] != chain:
+                    chain = line[21:22]
+                    chains.setdefault(chain, [[]])
+                    residue = number = None
+            elif line.startswith(b'TER'):
+                chain = None
+            if line.startswith(b'ATOM'):
+                keep = not hydrogen.match(line[12:16].strip())
+            else:
+                # a hetero residue, such as MSE, left out of the
+                #  chain is a gap between the residues around it
+                if line.startswith(b'HETATM'):
+                    number = None
+                keep = keep and line.startswith(b'ANISOU')
+            if keep:
+                # chain, residue number and insertion code
+                if line[21:27] != residue:
+                    residue = line[21:27]
+                    # start a new segment after a gap, or when the
+                    #  residue number (ignoring the insertion code)
+                    #  is not the same as or one more than the last
+                    previous, number = number, int(line[22:26])
+                    segments = chains[chain]
+                    if segments[-1] and (previous is None
+                     or not 0 <= number - previous <= 1):
+                        segments.append([])
+                    segments[-1].append([])
+                lines = chains[chain][-1][-1]
+                # extend the last range when this line follows it
+                if lines and lines[-1][1] == start:
+                    lines[-1][1] = end
+                else:
+                    lines.append([start, end])
+            start = end
+
+        # slices of a memoryview are written straight from the
+        #  mapped file, without copying them to a bytes object
+        with memoryview(mm) as view:
+            # windows are numbered across all chains of the file,
+            #  so each window is written to an unique file
+            count = 0
+            # iterate over chains in file
+            for chain_id, segments in chains.items():
+                print("chain", chain_id.decode())
+                # iterate over each window of 9 residues in each segment
+                #  of the protein chain, stopping when less than 9
+                #  residues are left
+                for residues in segments:
+                    for start in range(len(residues) - 8):
+                        # write each subsequence to an unique file
+                        count += 1
+                        file_save = file_prefix + '_' + str(count) + '.pdb'
+                        with open(file_save, 'wb') as f:
+                            for lines in residues[start:start + 9]:
+                                for line_start, line_end in lines:
+                                    f.write(view[line_start:line_end])
+                            f.write(b'END\n')
+
+# iterate over files in directory named above, one file
+#  per worker process
+if __name__ == '__main__':
+    with os.scandir(directory) as entries:
+        pdb_files = [entry.path for entry in entries
+         if entry.is_file() and entry.name.endswith('pdb')]
+    with multiprocessing.Pool(os.cpu_count()) as pool:
+        pool.map(split_file, pdb_files, chunksize=4)